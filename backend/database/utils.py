@@ -18,6 +18,7 @@ def add_user(user: User) -> None:
         write_log("INFO", Database, "SET USER", user.username, "User successfully inserted into database.")
 
     except Exception as e:
+        CURSOR.connection.rollback()
         write_log("ERROR", Database, "SET USER", user.username, f"Failed to insert user: {e}")
 
 
@@ -73,18 +74,36 @@ def get_user(*, uid: int | None = None, username: str | None = None, fid: int |
 
 
 def add_file(file: File) -> None:
-    user: User | None = get_user(uid=file.uid)
-
-    if user:
+    try:
         CURSOR.execute(
                 """
-                INSERT INTO files (fname, flinks, data_center, uid)
-                VALUES (%s, %s, %s, %s);
-                """, (file.fname, file.flinks, file.data_center, file.uid),
+                WITH owner AS (SELECT uid, username
+                               FROM users
+                               WHERE uid = %s),
+                     inserted AS (INSERT INTO files (fname, flinks, data_center, uid)
+                                  SELECT %s, %s, %s, uid
+                                  FROM owner
+                                  RETURNING fid)
+                SELECT inserted.fid, owner.username
+                FROM inserted,
+                     owner;
+                """, (file.uid, file.fname, file.flinks, file.data_center),
         )
-        write_log("INFO", Database, "INSERT FILES", user.username, f"Insert query executed.")
+        data: dict[str, int | str] | None = CURSOR.fetchone()
         CURSOR.connection.commit()
-        write_log("INFO", Database, "INSERT FILES", user.username, f"File `{file.fname}` saved to database with {len(file.flinks)} part(s).")
+
+    except Exception as e:
+        CURSOR.connection.rollback()
+        write_log("ERROR", Database, "INSERT FILES", "", f"Failed to insert file `{file.fname}`, transaction rolled back: {e}")
+        raise
+
+    if data is None:
+        write_log("ERROR", Database, "INSERT FILES", "", f"No user found for uid={file.uid}, file `{file.fname}` not saved.")
+        raise ValueError(f"No user found for uid={file.uid}")
+
+    file.fid = data["fid"]
+    write_log("INFO", Database, "INSERT FILES", data["username"], "Insert query executed.")
+    write_log("INFO", Database, "INSERT FILES", data["username"], f"File `{file.fname}` saved to database with {len(file.flinks)} part(s).")
 
 
 def get_file(*, fid: int | None = None, fname: str | None = None, uid: int | None = None) -> File | None:
@@ -1,5 +1,8 @@
+from asyncio import to_thread
+from contextlib import aclosing
 from json import dumps
 from pathlib import Path
+from tempfile import mkstemp
 from typing import AsyncGenerator
 
 from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
@@ -13,6 +16,7 @@ from core.settings import TRANSFER_PATH
 from core.transfer import upload
 
 router: APIRouter = APIRouter(prefix="/auth")
+FORBIDDEN_CHARACTERS: dict[int, None] = dict.fromkeys(map(ord, '\\/:*?"<>|\0'))
 
 
 @router.post("/register")
@@ -47,20 +51,32 @@ async def upload_route(file: UploadFile, data_center: str = Form(...), current_u
     if current_user.uid is None:
         raise HTTPException(status_code=400, detail="User ID missing")
     uid = current_user.uid
-    if not file.filename:
-        raise ValueError("No file name provided in /upload")
+    filename: str = Path(file.filename or "").name
 
-    file_path: Path = TRANSFER_PATH / file.filename
+    if not filename or filename.startswith(".") or filename.translate(FORBIDDEN_CHARACTERS) != filename:
+        raise HTTPException(status_code=400, detail="Invalid file name")
 
-    with open(file_path, "wb") as buffer:
-        while chunk := await file.read(BackEnd.MAX_SIZE):
-            buffer.write(chunk)
+    file_path: Path = TRANSFER_PATH / filename
+    fd, spool_name = mkstemp(dir=TRANSFER_PATH, prefix=".", suffix=".part")
+    spool_path: Path = Path(spool_name)
 
-    file_job: File = File(fname=file.filename, flinks=[], data_center=data_center, uid=uid)
+    try:
+        with open(fd, "wb") as buffer:
+            while chunk := await file.read(BackEnd.MAX_SIZE):
+                await to_thread(buffer.write, chunk)
+
+        spool_path.replace(file_path)
+
+    except BaseException:
+        spool_path.unlink(missing_ok=True)
+        raise
+
+    file_job: File = File(fname=filename, flinks=[], data_center=data_center, uid=uid)
 
     async def progress_stream() -> AsyncGenerator[str, None]:
-        async for progress in upload(file_job):
-            yield dumps({"progress": progress}) + "\n"
+        async with aclosing(upload(file_job)) as progresses:
+            async for progress in progresses:
+                yield dumps({"progress": progress}) + "\n"
 
     return StreamingResponse(progress_stream(), media_type="text/plain")
 
@@ -1,6 +1,6 @@
 from asyncio import AbstractEventLoop
 
-from discord import TextChannel
+from discord import TextChannel, Webhook
 from telegram.ext import Application
 
 from core.settings import getenv
@@ -47,8 +47,13 @@ class Discord(DataCenter, metaclass=ConfigMeta):
     ADMIN: int = int(getenv("DISCORD_ADMIN"))
     FILE_DUMP_ID: int = int(getenv("DISCORD_FILE_DUMP_ID"))
     MAX_SIZE: int = 10_000_000
+    MAX_SIZE_CAP: int = 25_000_000
+    MAX_SIZE_HEADROOM: int = 500_000
     MAX_DELETE_LIMIT: int = 100
+    MAX_CONCURRENCY: int = 5
+    WEBHOOK_NAME: str = "Store Limitless"
     FILE_DUMP: TextChannel
+    WEBHOOK: Webhook | None = None
     LOOP: AbstractEventLoop
 
 
@@ -59,4 +64,5 @@ class Telegram(DataCenter, metaclass=ConfigMeta):
     FILE_DUMP_ID: int = int(getenv("TELEGRAM_FILE_DUMP_ID"))
     MAX_SIZE: int = 10_000_000
     MAX_DELETE_LIMIT: int = 100
+    MAX_CONCURRENCY: int = 5
     FILE_DUMP: Application
@@ -1,9 +1,11 @@
 from asyncio import get_running_loop
 from traceback import format_exc
 
+from discord import HTTPException, Webhook
+
 import core.discord_utils.transfer
 from core.data_center import Discord
-from core.discord_utils.setup import app, app
+from core.discord_utils.setup import app
 from core.utils import write_log
 
 
@@ -14,7 +16,21 @@ async def on_ready():
         Discord.LOOP = get_running_loop()
 
         if Discord.FILE_DUMP:
+            Discord.MAX_SIZE = min(Discord.FILE_DUMP.guild.filesize_limit - Discord.MAX_SIZE_HEADROOM, Discord.MAX_SIZE_CAP)
             write_log("INFO", Discord, "INIT", str(app.user), f"FILE_DUMP channel initialized: {Discord.FILE_DUMP.name} (id={Discord.FILE_DUMP.id}).")
+            write_log("INFO", Discord, "INIT", str(app.user), f"Part size set from the guild upload limit: {Discord.MAX_SIZE} bytes.")
+
+            try:
+                webhooks: list[Webhook] = await Discord.FILE_DUMP.webhooks()
+                Discord.WEBHOOK = next((webhook for webhook in webhooks if webhook.user == app.user and webhook.token), None)
+
+                if Discord.WEBHOOK is None:
+                    Discord.WEBHOOK = await Discord.FILE_DUMP.create_webhook(name=Discord.WEBHOOK_NAME)
+
+                write_log("INFO", Discord, "INIT", str(app.user), f"Upload webhook ready: {Discord.WEBHOOK.name} (id={Discord.WEBHOOK.id}).")
+
+            except HTTPException as e:
+                write_log("ERROR", Discord, "INIT", str(app.user), f"Cannot manage webhooks in FILE_DUMP, uploading through the bot: {e}")
 
         else:
             write_log(
@@ -1,3 +1,5 @@
+from asyncio import to_thread
+from contextlib import aclosing
 from pathlib import Path
 from traceback import format_exc
 
@@ -8,7 +10,7 @@ import backend.database as database
 from core.data_center import Discord
 from core.discord_utils.setup import app
 from core.settings import TRANSFER_PATH
-from core.utils import write_log
+from core.utils import gather_ordered, write_log
 
 
 @app.command()
@@ -21,7 +23,7 @@ async def download(ctx: Context, uid: int, filename: str) -> None:
     final_path: Path = (TRANSFER_PATH / Path(filename).name).resolve()
 
     try:
-        if not final_path.is_relative_to(TRANSFER_PATH.resolve()):
+        if not final_path.is_relative_to(TRANSFER_PATH):
             write_log("ERROR", Discord, "DOWNLOAD", user.username, f"Illegal file path attempted: {filename}.")
             return
 
@@ -48,28 +50,27 @@ async def download(ctx: Context, uid: int, filename: str) -> None:
         write_log("INFO", Discord, "DOWNLOAD", user.username, f"Starting download for `{final_path.name}` ({total_parts} part(s)).")
 
         with final_path.open("wb") as file:
-            for i, msg_id in enumerate(links, start=1):
-                try:
-                    msg: Message = await Discord.FILE_DUMP.fetch_message(int(msg_id))
+            i: int = 0
 
-                    if not msg.attachments:
-                        raise ValueError("No attachment found in message.")
+            try:
+                async with aclosing(gather_ordered((fetch_part(msg_id) for msg_id in links), Discord.MAX_CONCURRENCY)) as parts:
+                    async for data in parts:
+                        await to_thread(file.write, data)
+                        i += 1
+                        progress: float = (i / total_parts) * 100
 
-                    file.write(await msg.attachments[0].read())
-                    progress: float = (i / total_parts) * 100
+                        write_log(
+                                "INFO", Discord, "DOWNLOAD", user.username,
+                                f"Downloaded part {i}/{total_parts} ({progress:.1f}%) of `{final_path.name}`.",
+                        )
 
-                    write_log(
-                            "INFO", Discord, "DOWNLOAD", user.username,
-                            f"Downloaded part {i}/{total_parts} ({progress:.1f}%) of `{final_path.name}`.",
-                    )
+            except Exception as e:
+                write_log("ERROR", Discord, "DOWNLOAD", user.username, f"Failed at part {i + 1}/{total_parts} of `{final_path.name}`: {e}")
 
-                except Exception as e:
-                    write_log("ERROR", Discord, "DOWNLOAD", user.username, f"Failed at part {i}/{total_parts} of `{final_path.name}`: {e}")
+                if final_path.exists():
+                    final_path.unlink()
 
-                    if final_path.exists():
-                        final_path.unlink()
-
-                    return
+                return
 
         write_log("INFO", Discord, "DOWNLOAD", user.username, f"Downloaded file `{final_path.name}` successfully.")
 
@@ -78,3 +79,12 @@ async def download(ctx: Context, uid: int, filename: str) -> None:
                 "ERROR", Discord, "DOWNLOAD", user.username if user else "",
                 f"Unhandled exception during download of `{filename}`: {e}\n{format_exc()}",
         )
+
+
+async def fetch_part(msg_id: str) -> bytes:
+    msg: Message = await Discord.FILE_DUMP.fetch_message(int(msg_id))
+
+    if not msg.attachments:
+        raise ValueError("No attachment found in message.")
+
+    return await msg.attachments[0].read()
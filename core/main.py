@@ -22,5 +22,5 @@ if __name__ == "__main__":
     try:
         main()
 
-    except:
+    except KeyboardInterrupt:
         pass
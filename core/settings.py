@@ -5,7 +5,7 @@ from typing import TextIO
 from dotenv import load_dotenv
 
 LOG_PATH: Path = Path("..") / "logs.txt"
-TRANSFER_PATH: Path = Path('.') / "transfer"
+TRANSFER_PATH: Path = (Path('.') / "transfer").resolve()
 LOG_HANDLER: TextIO = open(LOG_PATH, 'a')
 TRANSFER_PATH.mkdir(exist_ok=True)
 load_dotenv()
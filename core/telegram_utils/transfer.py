@@ -1,13 +1,14 @@
-from io import BytesIO
+from asyncio import to_thread
+from contextlib import aclosing
 from pathlib import Path
 
-from telegram import File, Message, Update
+from telegram import Bot, File, Message, Update
 from telegram.ext import ContextTypes
 
 from backend import database
 from core.data_center import Telegram
 from core.settings import TRANSFER_PATH
-from core.utils import write_log
+from core.utils import gather_ordered, write_log
 
 
 async def download(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -36,7 +37,7 @@ async def download(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     final_path: Path = (TRANSFER_PATH / Path(filename).name).resolve()
 
     try:
-        if not final_path.is_relative_to(TRANSFER_PATH.resolve()):
+        if not final_path.is_relative_to(TRANSFER_PATH):
             write_log("ERROR", Telegram, "DOWNLOAD", user.username, f"Illegal file path attempted: {filename}.")
             return
 
@@ -63,32 +64,38 @@ async def download(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         write_log("INFO", Telegram, "DOWNLOAD", user.username, f"Starting download for `{final_path.name}` ({total_parts} part(s)).")
 
         with final_path.open("wb") as output:
-            for i, msg_id in enumerate(links, start=1):
-                try:
-                    msg: Message = await context.bot.get_message(chat_id=Telegram.FILE_DUMP_ID, message_id=int(msg_id))
+            i: int = 0
 
-                    if not msg.document:
-                        raise ValueError("No document found in message.")
+            try:
+                async with aclosing(gather_ordered((fetch_part(context.bot, msg_id) for msg_id in links), Telegram.MAX_CONCURRENCY)) as parts:
+                    async for data in parts:
+                        await to_thread(output.write, data)
+                        i += 1
+                        progress: float = (i / total_parts) * 100
+                        write_log(
+                                "INFO", Telegram, "DOWNLOAD", user.username,
+                                f"Downloaded part {i}/{total_parts} ({progress:.1f}%) of `{final_path.name}`.",
+                        )
 
-                    file_obj: File = await context.bot.get_file(msg.document.file_id)
-                    buffer: BytesIO = BytesIO()
-                    await file_obj.download_to_memory(buffer)
-                    output.write(buffer.getvalue())
-                    progress: float = (i / total_parts) * 100
-                    write_log(
-                            "INFO", Telegram, "DOWNLOAD", user.username,
-                            f"Downloaded part {i}/{total_parts} ({progress:.1f}%) of `{final_path.name}`.",
-                    )
+            except Exception as e:
+                write_log("ERROR", Telegram, "DOWNLOAD", user.username, f"Failed at part {i + 1}/{total_parts} of `{final_path.name}`: {e}")
 
-                except Exception as e:
-                    write_log("ERROR", Telegram, "DOWNLOAD", user.username, f"Failed at part {i}/{total_parts} of `{final_path.name}`: {e}")
+                if final_path.exists():
+                    final_path.unlink()
 
-                    if final_path.exists():
-                        final_path.unlink()
-
-                    return
+                return
 
         write_log("INFO", Telegram, "DOWNLOAD", user.username, f"Downloaded file `{final_path.name}` successfully.")
 
     except Exception as e:
         write_log("ERROR", Telegram, "DOWNLOAD", user.username if user else "", f"Unhandled exception during download of `{filename}`: {e}")
+
+
+async def fetch_part(bot: Bot, msg_id: str) -> bytearray:
+    msg: Message = await bot.get_message(chat_id=Telegram.FILE_DUMP_ID, message_id=int(msg_id))
+
+    if not msg.document:
+        raise ValueError("No document found in message.")
+
+    file_obj: File = await bot.get_file(msg.document.file_id)
+    return await file_obj.download_as_bytearray()
@@ -1,21 +1,25 @@
-from asyncio import run_coroutine_threadsafe
+from asyncio import run_coroutine_threadsafe, sleep as async_sleep, to_thread, wrap_future
+from contextlib import aclosing
+from datetime import timedelta
 from io import BytesIO
 from pathlib import Path
 from time import sleep
 from traceback import format_exc
-from typing import Any, AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, BinaryIO, Coroutine, Generator
 
 import discord
+from telegram.error import RetryAfter, TelegramError
 
 from backend.database import add_file, File, get_file, get_user, User
 from core.data_center import DataCenter, Discord, Telegram
 from core.settings import TRANSFER_PATH
-from core.utils import write_log
+from core.utils import gather_ordered, write_log
 
 
 async def upload(file: File) -> AsyncGenerator[float, None]:
     user: User | None = get_user(uid=file.uid)
     data_center: type[DataCenter] = DataCenter(file.data_center)
+    sent: dict[int, int] = {}
 
     if not user:
         return
@@ -29,75 +33,144 @@ async def upload(file: File) -> AsyncGenerator[float, None]:
 
         file_path: Path = (TRANSFER_PATH / Path(file.fname).name).resolve()
 
-        if not file_path.is_relative_to(TRANSFER_PATH.resolve()):
+        if not file_path.is_relative_to(TRANSFER_PATH):
             write_log("ERROR", data_center, "UPLOAD", user.username, f"Illegal file path attempted: {file.fname}")
             return
 
-        if not file_path.exists():
+        try:
+            file_size: int = file_path.stat().st_size
+
+        except FileNotFoundError:
             write_log("ERROR", data_center, "UPLOAD", user.username, f"Local file not found: {file_path}")
             return
 
         write_log("INFO", data_center, "UPLOAD", user.username, f"Found local file: {file_path.name}")
 
-        match file.data_center:
-            case Discord.NAME:
-                max_size: int = Discord.MAX_SIZE
-
-            case Telegram.NAME:
-                max_size: int = Telegram.MAX_SIZE
-
-            case _:
-                raise ValueError("Unknown data center")
+        if data_center not in (Discord, Telegram):
+            raise ValueError("Unknown data center")
 
-        file_size: int = file_path.stat().st_size
+        max_size: int = data_center.MAX_SIZE
         total_parts: int = (file_size + max_size - 1) // max_size
         write_log("INFO", data_center, "UPLOAD", user.username, f"Starting upload `{file_path.name}` ({total_parts} parts)", )
 
         with file_path.open("rb") as f:
-            for i in range(1, total_parts + 1):
-                chunk: bytes = f.read(max_size)
-
-                if not chunk:
-                    break
-
-                filename: str = f"{file_path.name}{'' if total_parts == 1 else f'.part{i:03d}'}"
-
-                while True:
-                    try:
-                        match file.data_center:
-                            case Discord.NAME:
-                                msg_id: int = run_coroutine_threadsafe(
-                                        Discord.FILE_DUMP.send(file=discord.File(BytesIO(chunk), filename=filename)),
-                                        Discord.LOOP,
-                                ).result().id
-
-                            case Telegram.NAME:
-                                msg_id = (await Telegram.FILE_DUMP.send_document(
-                                        chat_id=Telegram.FILE_DUMP_ID,
-                                        document=BytesIO(chunk),
-                                        filename=filename,
-                                        write_timeout=36_000,
-                                        read_timeout=36_000,
-                                        connect_timeout=60,
-                                        pool_timeout=36_000,
-                                )).id
-
-                        break
-
-                    except OSError as e:
-                        write_log("ERROR", data_center, "UPLOAD", user.username, f"Network error part {i}/{total_parts}, retrying: {e}")
-
-                file.flinks.append(str(msg_id))
-                progress: float = round((i / total_parts) * 100, 2)
-                write_log("INFO", data_center, "UPLOAD", user.username, f"Uploaded {i}/{total_parts} ({progress:.1f}%)")
-                yield progress
+            async def send(index: int, filename: str, offset: int, size: int) -> int:
+                sent[index] = await send_part(data_center, user.username, await load_part(f, file_size, offset, size), filename)
+                return sent[index]
+
+            parts: Generator[Coroutine[Any, Any, int], None, None] = (
+                    send(index, filename, offset, size)
+                    for index, (filename, offset, size) in enumerate(split(file_path.name, file_size, max_size))
+            )
+
+            async with aclosing(gather_ordered(parts, data_center.MAX_CONCURRENCY)) as msg_ids:
+                async for msg_id in msg_ids:
+                    file.flinks.append(str(msg_id))
+                    progress: float = round((len(file.flinks) / total_parts) * 100, 2)
+                    write_log("INFO", data_center, "UPLOAD", user.username, f"Uploaded {len(file.flinks)}/{total_parts} ({progress:.1f}%)")
+                    yield progress
 
         add_file(file)
-        write_log("INFO", data_center, "UPLOAD", user.username, f"Upload complete `{file_path.name}`")
-        (TRANSFER_PATH / file.fname).unlink()
+
+    except (discord.HTTPException, TelegramError) as e:
+        write_log("ERROR", data_center, "UPLOAD", user.username, f"Data center rejected `{file.fname}` after {len(sent)} part(s): {e}")
+        return
 
     except Exception as e:
         write_log("ERROR", data_center, "UPLOAD", user.username if user else "", f"Unhandled exception: {e}\n{format_exc()}")
+        return
+
+    finally:
+        if sent and file.fid is None:
+            file.flinks = [str(msg_id) for _, msg_id in sorted(sent.items())]
+            await discard(file, user.username)
+
+    write_log("INFO", data_center, "UPLOAD", user.username, f"Upload complete `{file.fname}`")
+    (TRANSFER_PATH / file.fname).unlink(missing_ok=True)
+
+
+def split(name: str, file_size: int, max_size: int) -> Generator[tuple[str, int, int], None, None]:
+    if 0 < file_size <= max_size:
+        yield name, 0, file_size
+        return
+
+    for i, offset in enumerate(range(0, file_size, max_size), start=1):
+        yield f"{name}.part{i:03d}", offset, min(max_size, file_size - offset)
+
+
+async def load_part(f: BinaryIO, file_size: int, offset: int, size: int) -> BinaryIO:
+    if size == file_size:
+        return f
+
+    return BytesIO(await to_thread(read_part, Path(f.name), offset, size))
+
+
+def read_part(path: Path, offset: int, size: int) -> bytes:
+    with path.open("rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+async def send_part(data_center: type[DataCenter], username: str, payload: BinaryIO, filename: str) -> int:
+    while True:
+        try:
+            payload.seek(0)
+
+            match data_center.NAME:
+                case Discord.NAME:
+                    part: discord.File = discord.File(payload, filename=filename)
+                    msg_id: int = (await wrap_future(run_coroutine_threadsafe(
+                            Discord.WEBHOOK.send(file=part, wait=True) if Discord.WEBHOOK else Discord.FILE_DUMP.send(file=part),
+                            Discord.LOOP,
+                    ))).id
+
+                case Telegram.NAME:
+                    msg_id = (await Telegram.FILE_DUMP.send_document(
+                            chat_id=Telegram.FILE_DUMP_ID,
+                            document=payload,
+                            filename=filename,
+                            write_timeout=36_000,
+                            read_timeout=36_000,
+                            connect_timeout=60,
+                            pool_timeout=36_000,
+                    )).id
+
+            break
+
+        except RetryAfter as e:
+            delay: float = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            write_log("ERROR", data_center, "UPLOAD", username, f"Rate limited on `{filename}`, retrying in {delay}s")
+            await async_sleep(delay)
+
+        except OSError as e:
+            write_log("ERROR", data_center, "UPLOAD", username, f"Network error on `{filename}`, retrying: {e}")
+
+    return msg_id
+
+
+async def discard(file: File, username: str) -> None:
+    data_center: type[DataCenter] = DataCenter(file.data_center)
+    links: list[int] = [int(link) for link in file.flinks]
+
+    try:
+        for i in range(0, len(links), data_center.MAX_DELETE_LIMIT):
+            batch: list[int] = links[i:i + data_center.MAX_DELETE_LIMIT]
+
+            match file.data_center:
+                case Discord.NAME:
+                    await wrap_future(run_coroutine_threadsafe(
+                            Discord.FILE_DUMP.delete_messages([discord.Object(id=msg_id) for msg_id in batch]),
+                            Discord.LOOP,
+                    ))
+
+                case Telegram.NAME:
+                    await Telegram.FILE_DUMP.delete_messages(chat_id=Telegram.FILE_DUMP_ID, message_ids=batch)
+
+        write_log("INFO", data_center, "DISCARD", username, f"Deleted {len(links)} orphaned part(s) of `{file.fname}`.")
+        file.flinks.clear()
+
+    except Exception as e:
+        write_log("ERROR", data_center, "DISCARD", username, f"Failed to delete orphaned parts of `{file.fname}`: {e}")
 
 
 def download(file: File) -> Generator[float, Any, None]:
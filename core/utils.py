@@ -1,17 +1,47 @@
+from asyncio import create_task, gather, Task
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
 from logging import basicConfig, getLogger, INFO, WARNING
-
-from filelock import BaseFileLock, FileLock
+from threading import Lock
+from time import time
+from typing import Any, AsyncGenerator, Coroutine, Iterable, TypeVar
 
 from core.data_center import DataCenter
 from core.settings import LOG_HANDLER, LOG_PATH
 
-LOCK: BaseFileLock = FileLock("logs.txt.lock")
+LOCK: Lock = Lock()
 basicConfig(level=INFO, filename=LOG_PATH, filemode="a", format="[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s")
 getLogger("httpx").setLevel(WARNING)
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=1)
+def timestamp(second: int) -> str:
+    return datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
 
 
 def write_log(level: str, data_center: type[DataCenter], func: str, user: str, message: str) -> None:
     with LOCK:
-        LOG_HANDLER.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [{data_center}] [{level}] [{func}] [{user}] {message}\n")
+        LOG_HANDLER.write(f"[{timestamp(int(time()))}] [{data_center}] [{level}] [{func}] [{user}] {message}\n")
         LOG_HANDLER.flush()
+
+
+async def gather_ordered(coros: Iterable[Coroutine[Any, Any, T]], limit: int) -> AsyncGenerator[T, None]:
+    pending: deque[Task[T]] = deque()
+
+    try:
+        for coro in coros:
+            pending.append(create_task(coro))
+
+            if len(pending) >= limit:
+                yield await pending.popleft()
+
+        while pending:
+            yield await pending.popleft()
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+        await gather(*pending, return_exceptions=True)